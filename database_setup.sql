@@ -28,9 +28,20 @@ ON public.transactions(user_id, date DESC);
 CREATE INDEX IF NOT EXISTS idx_transactions_type 
 ON public.transactions(type);
 
-CREATE INDEX IF NOT EXISTS idx_transactions_category 
+CREATE INDEX IF NOT EXISTS idx_transactions_category
 ON public.transactions(category);
 
+-- Matches the listing ORDER BY (date DESC, created_at DESC) per user
+CREATE INDEX IF NOT EXISTS idx_transactions_user_date_created
+ON public.transactions(user_id, date DESC, created_at DESC);
+
+-- Partial indexes for per-type aggregation in the summary endpoint
+CREATE INDEX IF NOT EXISTS idx_transactions_user_income
+ON public.transactions(user_id, date) WHERE type = 'income';
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_expense
+ON public.transactions(user_id, date) WHERE type = 'expense';
+
 -- Create updated_at trigger
 CREATE OR REPLACE FUNCTION public.update_updated_at_column()
 RETURNS TRIGGER AS $$